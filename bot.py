@@ -1,39 +1,133 @@
-import json
+import asyncio
+import logging
+import os
 import random
+import threading
 import time
-from datetime import datetime
+from collections import namedtuple
+from decimal import Decimal
+from functools import lru_cache
+from types import MappingProxyType
 
-# --- Lightweight/faster helpers ---
-def _fast_hex(n_bytes=8):
-    """Generate short hex string quickly (n_bytes default 8 -> 16 hex chars)."""
-    return "0x" + format(random.getrandbits(n_bytes * 8), "x").rjust(n_bytes * 2, "0")
+log = logging.getLogger(__name__)
 
-def _now_ts():
-    """Single fast timestamp call."""
-    return int(time.time())
+# --- Lightweight/faster helpers ---
+_ETHER = 10**18
+_GWEI = 10**9
+_UNIT_MULT = {"ether": _ETHER, "gwei": _GWEI}
 
 def _to_wei(val, unit):
-    if unit == "ether":
-        return int(float(val) * 10**18)
-    if unit == "gwei":
-        return int(float(val) * 10**9)
-    return int(val)
+    mult = _UNIT_MULT.get(unit, 1)
+    # Integer fast paths; Decimal otherwise (float would lose precision)
+    if isinstance(val, int):
+        return val * mult
+    if isinstance(val, str) and val.isdigit():
+        return int(val) * mult
+    return int(Decimal(str(val)) * mult)
+
+def _freeze(obj):
+    """Deep read-only copy of a JSON-like ABI: dicts -> MappingProxyType, lists -> tuples."""
+    if isinstance(obj, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in obj.items()})
+    if isinstance(obj, (list, tuple)):
+        return tuple(_freeze(v) for v in obj)
+    return obj
+
+# --- Raw ABI helpers (enough for Multicall3 aggregate3 + ERC20 reads) ---
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+_AGGREGATE3 = bytes.fromhex("82ad56cb")
+_BALANCEOF = bytes.fromhex("70a08231")
+_DECIMALS = bytes.fromhex("313ce567")
+_SYMBOL = bytes.fromhex("95d89b41")
+_ALLOWANCE = bytes.fromhex("dd62ed3e")
+_MAX_UINT256 = 2**256 - 1
+# selector -> function name, for the dummy eth_call
+_SELECTOR_NAMES = {_BALANCEOF: "balanceOf", _DECIMALS: "decimals", _SYMBOL: "symbol", _ALLOWANCE: "allowance"}
+
+def _word(n):
+    return n.to_bytes(32, "big")
+
+def _pad_address(addr):
+    """Left-pad a 0x address to a 32-byte ABI word."""
+    return bytes(12) + bytes.fromhex(addr[2:])
+
+@lru_cache(maxsize=1024)
+def _encode_balanceof(owner):
+    """balanceOf(owner) calldata, encoded once per owner."""
+    return _BALANCEOF + _pad_address(owner)
+
+@lru_cache(maxsize=1024)
+def _encode_allowance(owner, spender):
+    """allowance(owner, spender) calldata, encoded once per pair."""
+    return _ALLOWANCE + _pad_address(owner) + _pad_address(spender)
+
+def _encode_rows(rows):
+    """Encode a dynamic array of tuples shaped (static words..., bytes)."""
+    heads, tails, offset = [], [], 32 * len(rows)
+    for *words, blob in rows:
+        padded = blob + bytes(-len(blob) % 32)
+        body = b"".join(_word(w) for w in words)
+        body += _word(32 * (len(words) + 1)) + _word(len(blob)) + padded
+        heads.append(_word(offset))
+        tails.append(body)
+        offset += len(body)
+    return _word(32) + _word(len(rows)) + b"".join(heads) + b"".join(tails)
+
+def _decode_rows(data, n_words):
+    """Inverse of _encode_rows: return a list of (words..., bytes) tuples."""
+    base = int.from_bytes(data[:32], "big")
+    count = int.from_bytes(data[base:base + 32], "big")
+    start = base + 32
+    rows = []
+    for i in range(count):
+        pos = start + int.from_bytes(data[start + 32 * i:start + 32 * (i + 1)], "big")
+        words = [int.from_bytes(data[pos + 32 * j:pos + 32 * (j + 1)], "big") for j in range(n_words)]
+        blob_pos = pos + int.from_bytes(data[pos + 32 * n_words:pos + 32 * (n_words + 1)], "big")
+        size = int.from_bytes(data[blob_pos:blob_pos + 32], "big")
+        rows.append((*words, data[blob_pos + 32:blob_pos + 32 + size]))
+    return rows
+
+def _decode_uint(ret):
+    return int.from_bytes(ret[:32], "big")
+
+def _decode_string(ret):
+    size = int.from_bytes(ret[32:64], "big")
+    return ret[64:64 + size].decode()
+
+def _encode_string(s):
+    raw = s.encode()
+    return _word(32) + _word(len(raw)) + raw + bytes(-len(raw) % 32)
 
 # --- Dummy web3/account simulation classes (lightweight) ---
 class DummyEth:
+    __slots__ = ()
     def contract(self, address=None, abi=None):
         return DummyContract(address, abi)
     def get_block(self, arg):
-        return {"timestamp": _now_ts()}
-    def get_transaction_count(self, address):
+        return {"timestamp": int(time.time())}
+    def get_transaction_count(self, address, block_identifier="latest"):
         # small deterministic-ish nonce for demo
         return random.randint(0, 20)
+    def call(self, tx):
+        # eth_call: answer Multicall3 aggregate3 and plain ERC20 reads
+        data = bytes(tx["data"])
+        if data[:4] == _AGGREGATE3:
+            results = []
+            for _target, _allow_failure, inner in _decode_rows(data[4:], 2):
+                results.append((1, self.call({"data": inner})))
+            # aggregate3 returns (bool success, bytes returnData)[]
+            return _encode_rows(results)
+        name = _SELECTOR_NAMES.get(data[:4])
+        if name is None:
+            raise ValueError("execution reverted")
+        value = DummyFunction(name).call()
+        return _encode_string(value) if isinstance(value, str) else _word(value)
     def send_raw_transaction(self, raw):
-        # return bytes-like txhash (short)
-        hx = _fast_hex(8)[2:]  # 8 bytes -> 16 hex chars
-        return bytes.fromhex(hx)
+        # return bytes-like txhash (short, 8 bytes)
+        return os.urandom(8)
 
 class DummyWeb3:
+    __slots__ = ("eth",)
     def __init__(self):
         self.eth = DummyEth()
     def to_wei(self, val, unit):
@@ -44,28 +138,32 @@ class DummyWeb3:
         return a
 
 class DummyAccount:
+    __slots__ = ("address",)
     def __init__(self, private_key):
         # Generate a short dummy address (not real)
-        self.address = "0x" + format(random.getrandbits(160), "x").rjust(40, "0")
+        self.address = "0x" + os.urandom(20).hex()
     def sign_transaction(self, tx):
         class Signed:
             rawTransaction = b"dummy_tx"
         return Signed()
 
 class DummyFunction:
+    # name -> simulated .call() result
+    _CALL_DISPATCH = {
+        # smaller random balance to avoid huge ints, still simulated
+        "balanceOf": lambda: random.randint(1, 10**18),
+        "decimals": lambda: 18,
+        "symbol": lambda: "TOK",
+        "allowance": lambda: 0,
+    }
+    __slots__ = ("name", "return_val", "build_template")
     def __init__(self, name, return_val=None, build_template=None):
         self.name = name
         self.return_val = return_val
         self.build_template = build_template
     def call(self):
-        if self.name == "balanceOf":
-            # smaller random balance to avoid huge ints, still simulated
-            return random.randint(1, 10**18)
-        if self.name == "decimals":
-            return 18
-        if self.name == "symbol":
-            return "TOK"
-        return self.return_val or 0
+        fn = self._CALL_DISPATCH.get(self.name)
+        return fn() if fn else (self.return_val or 0)
     def build_transaction(self, txdict):
         # Lightweight tx dict (keeps same keys used in original script)
         tx = {
@@ -81,39 +179,154 @@ class DummyFunction:
             tx.update(self.build_template)
         return tx
 
+class DummyContractFunctions:
+    """Stateless stand-in for web3's `contract.functions`; one shared instance."""
+    __slots__ = ()
+    # function name -> factory building the DummyFunction for its args
+    _FUNCTIONS = {
+        "balanceOf": lambda addr: DummyFunction("balanceOf"),
+        "decimals": lambda: DummyFunction("decimals"),
+        "symbol": lambda: DummyFunction("symbol"),
+        "allowance": lambda owner, spender: DummyFunction("allowance"),
+        "approve": lambda spender, value: DummyFunction(
+            "approve", build_template={"approved_to": spender, "approved_value": value}),
+        "swapExactETHForTokens": lambda *args, **kwargs: DummyFunction(
+            "swapExactETHForTokens", build_template={"swap": "eth->tokens"}),
+        "swapExactTokensForETH": lambda *args, **kwargs: DummyFunction(
+            "swapExactTokensForETH", build_template={"swap": "tokens->eth"}),
+    }
+    def __getattr__(self, name):
+        try:
+            return self._FUNCTIONS[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+_CONTRACT_FUNCTIONS = DummyContractFunctions()
+
 class DummyContract:
+    __slots__ = ("address", "abi", "functions")
     def __init__(self, address=None, abi=None):
         self.address = address or "0xDummyContract"
         self.abi = abi or []
         # functions container similar to web3 contract.functions
-        self.functions = self
-    def balanceOf(self, addr):
-        return DummyFunction("balanceOf")
-    def decimals(self):
-        return DummyFunction("decimals")
-    def symbol(self):
-        return DummyFunction("symbol")
-    def approve(self, spender, value):
-        return DummyFunction("approve", build_template={"approved_to": spender, "approved_value": value})
-    def swapExactETHForTokens(self, *args, **kwargs):
-        return DummyFunction("swapExactETHForTokens", build_template={"swap": "eth->tokens"})
-    def swapExactTokensForETH(self, *args, **kwargs):
-        return DummyFunction("swapExactTokensForETH", build_template={"swap": "tokens->eth"})
+        self.functions = _CONTRACT_FUNCTIONS
 
 # ---------- Dummy Config (kept similar names) ----------
 ANKR_RPC = "https://rpc.ankr.com/multichain/f943d482902e1f866767c57053e9e5db3575dd95e27a5e79c68463005b0a0259"
 PRIVATE_KEY = "YOUR_PRIVATE_KEY_HERE"  # still placeholder in dummy
+CHAIN_ID = 1
 ROUTER_ADDRESS = "0x7a250d5630B4cF539739dF2C5dAcb4c659F2488D"
 WETH_ADDRESS = "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2"
+_GAS_PRICE_WEI = 5 * _GWEI  # 5 gwei
+_DEADLINE_SECS = 1200
+USE_REAL_WEB3 = False  # True: web3 over ANKR_RPC + CoincurveAccount (needs the optional deps)
+APPROVE_UNLIMITED = False  # opt-in: approve max uint256 once so later sells skip approve
+
+# ---------- Fast real signer (optional: coincurve + pycryptodome) ----------
+def _rlp_int(n):
+    return n.to_bytes((n.bit_length() + 7) // 8, "big")
+
+def _rlp_bytes(b):
+    if len(b) == 1 and b[0] < 0x80:
+        return b
+    return _rlp_prefix(len(b), 0x80) + b
 
-# Initialize dummy web3 & account (fast)
-web3 = DummyWeb3()
-account = DummyAccount(PRIVATE_KEY)
-ADDRESS = account.address
+def _rlp_list(items):
+    body = b"".join(_rlp_bytes(_rlp_int(i) if isinstance(i, int) else i) for i in items)
+    return _rlp_prefix(len(body), 0xC0) + body
 
-# ---------- Router ABI (unchanged) ----------
-UNISWAP_ROUTER_ABI = json.loads("""
-[
+def _rlp_prefix(size, offset):
+    if size < 56:
+        return bytes([offset + size])
+    size_bytes = _rlp_int(size)
+    return bytes([offset + 55 + len(size_bytes)]) + size_bytes
+
+def _hex_bytes(v):
+    if isinstance(v, (bytes, bytearray)):
+        return bytes(v)
+    return bytes.fromhex(v[2:] if v[:2] in ("0x", "0X") else v)
+
+SignedTx = namedtuple("SignedTx", "rawTransaction hash")
+
+class CoincurveAccount:
+    """Legacy (EIP-155) tx signer on libsecp256k1 instead of pure-Python eth-account.
+
+    The key is loaded into coincurve once; each sign is RLP + keccak + one
+    C-level recoverable ECDSA call.
+    """
+    __slots__ = ("_key", "_keccak", "address")
+    def __init__(self, private_key):
+        import coincurve
+        from Crypto.Hash import keccak
+        self._key = coincurve.PrivateKey(_hex_bytes(private_key))
+        self._keccak = lambda data: keccak.new(digest_bits=256, data=data).digest()
+        pub = self._key.public_key.format(compressed=False)[1:]
+        self.address = "0x" + self._keccak(pub)[-20:].hex()
+    def sign_transaction(self, tx):
+        chain_id = tx.get("chainId", CHAIN_ID)
+        fields = [
+            tx["nonce"],
+            tx["gasPrice"],
+            tx["gas"],
+            _hex_bytes(tx["to"]) if tx.get("to") else b"",
+            tx.get("value", 0),
+            _hex_bytes(tx.get("data", b"")),
+        ]
+        digest = self._keccak(_rlp_list(fields + [chain_id, 0, 0]))
+        sig = self._key.sign_recoverable(digest, hasher=None)  # r || s || recid
+        v = sig[64] + chain_id * 2 + 35
+        raw = _rlp_list(fields + [v, int.from_bytes(sig[:32], "big"), int.from_bytes(sig[32:64], "big")])
+        return SignedTx(raw, self._keccak(raw))
+
+# ---------- Provider / account setup ----------
+@lru_cache(maxsize=1)
+def _http_session():
+    """Shared keep-alive session for the real HTTPProvider.
+
+    RPCs run on asyncio.to_thread workers (see _rpc) and the head watcher,
+    so the pool holds enough warm TLS connections for all of them to reuse.
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=32)  # one host; to_thread's max workers
+    session.mount("https://", adapter)
+    return session
+
+if USE_REAL_WEB3:
+    from web3 import Web3
+    from web3.exceptions import ContractLogicError
+    # Errors meaning "this call can't be answered", as opposed to transport failures
+    _CALL_REVERT_ERRORS = (ValueError, ContractLogicError)
+    web3 = Web3(Web3.HTTPProvider(ANKR_RPC, session=_http_session()))
+    account = CoincurveAccount(PRIVATE_KEY)
+else:
+    _CALL_REVERT_ERRORS = (ValueError,)
+    # Initialize dummy web3 & account (fast)
+    web3 = DummyWeb3()
+    account = DummyAccount(PRIVATE_KEY)
+ADDRESS = web3.to_checksum_address(account.address)
+
+# Checksum the constant addresses once instead of on every call
+ROUTER_ADDRESS = web3.to_checksum_address(ROUTER_ADDRESS)
+WETH_ADDRESS = web3.to_checksum_address(WETH_ADDRESS)
+
+@lru_cache(maxsize=4096)
+def _cs(a):
+    """Memoized checksum for user-supplied token addresses."""
+    return web3.to_checksum_address(a)
+
+# Swap paths as tuples, built once per token (web3 takes any iterable for address[])
+@lru_cache(maxsize=1024)
+def _buy_path(token):
+    return (WETH_ADDRESS, _cs(token))
+
+@lru_cache(maxsize=1024)
+def _sell_path(token):
+    return (_cs(token), WETH_ADDRESS)
+
+# ---------- Router ABI (frozen Python literal, no JSON parse at import) ----------
+UNISWAP_ROUTER_ABI = _freeze([
   {
     "name": "swapExactETHForTokens",
     "type": "function",
@@ -139,53 +352,193 @@ UNISWAP_ROUTER_ABI = json.loads("""
     "outputs": [{"name": "amounts", "type": "uint256[]"}],
     "stateMutability": "nonpayable"
   }
-]
-""")
+])
+
+# ---------- ERC20 ABIs (built and frozen once at import, shared by every call) ----------
+_ERC20_READ_ABI = _freeze((
+    {
+        "constant": True,
+        "inputs": [{"name": "_owner", "type": "address"}],
+        "name": "balanceOf",
+        "outputs": [{"name": "balance", "type": "uint256"}],
+        "type": "function"
+    },
+    {
+        "constant": True,
+        "inputs": [],
+        "name": "decimals",
+        "outputs": [{"name": "", "type": "uint8"}],
+        "type": "function"
+    },
+    {
+        "constant": True,
+        "inputs": [],
+        "name": "symbol",
+        "outputs": [{"name": "", "type": "string"}],
+        "type": "function"
+    }
+))
+
+_ERC20_WRITE_ABI = _freeze((
+    {
+        "constant": False,
+        "inputs": [
+            {"name": "spender", "type": "address"},
+            {"name": "value", "type": "uint256"}
+        ],
+        "name": "approve",
+        "outputs": [{"name": "", "type": "bool"}],
+        "type": "function"
+    },
+    {
+        "constant": True,
+        "inputs": [
+            {"name": "owner", "type": "address"},
+            {"name": "spender", "type": "address"}
+        ],
+        "name": "allowance",
+        "outputs": [{"name": "", "type": "uint256"}],
+        "type": "function"
+    },
+    {
+        "constant": True,
+        "inputs": [{"name": "owner", "type": "address"}],
+        "name": "balanceOf",
+        "outputs": [{"name": "", "type": "uint256"}],
+        "type": "function"
+    },
+    {
+        "constant": True,
+        "inputs": [],
+        "name": "decimals",
+        "outputs": [{"name": "", "type": "uint8"}],
+        "type": "function"
+    }
+))
 
 # Router (dummy contract instance)
-router = web3.eth.contract(address=web3.to_checksum_address(ROUTER_ADDRESS), abi=UNISWAP_ROUTER_ABI)
+router = web3.eth.contract(address=ROUTER_ADDRESS, abi=UNISWAP_ROUTER_ABI)
 
 # ---------- Core functions (same signatures & flow) ----------
+def _multicall(address, calls):
+    """Run several calldata blobs against one contract in a single eth_call.
+
+    Goes through Multicall3's aggregate3 and returns the raw return data of
+    each call, in order. Raises ValueError if Multicall3 answered with
+    nothing (not deployed on this chain), with the wrong number of results,
+    or if any sub-call failed.
+    """
+    target = int.from_bytes(bytes.fromhex(address[2:]), "big")
+    payload = _AGGREGATE3 + _encode_rows([(target, 0, data) for data in calls])
+    ret = bytes(web3.eth.call({"to": MULTICALL3_ADDRESS, "data": payload}))
+    if not ret:
+        raise ValueError("multicall returned no data (Multicall3 not deployed?)")
+    results = _decode_rows(ret, 1)
+    if len(results) != len(calls):
+        raise ValueError(f"multicall returned {len(results)} results for {len(calls)} calls")
+    if not all(ok for ok, _ in results):
+        raise ValueError("multicall sub-call failed")
+    return [data for _, data in results]
+
+def _call_uint(address, data):
+    """Raw eth_call with pre-encoded calldata, decoded as a single uint."""
+    return _decode_uint(bytes(web3.eth.call({"to": address, "data": data})))
+
+def _read_uints(address, calls):
+    """Read several uint results from one contract, batched when possible."""
+    try:
+        # _multicall raises unless it got exactly one result per call
+        return [_decode_uint(ret) for ret in _multicall(address, calls)]
+    except _CALL_REVERT_ERRORS:
+        # Multicall unavailable on this chain: fall back to one eth_call each
+        return [_call_uint(address, data) for data in calls]
+
 def check_token_balance(token_address):
-    erc20_abi = [
-        {
-            "constant": True,
-            "inputs": [{"name": "_owner", "type": "address"}],
-            "name": "balanceOf",
-            "outputs": [{"name": "balance", "type": "uint256"}],
-            "type": "function"
-        },
-        {
-            "constant": True,
-            "inputs": [],
-            "name": "decimals",
-            "outputs": [{"name": "", "type": "uint8"}],
-            "type": "function"
-        },
-        {
-            "constant": True,
-            "inputs": [],
-            "name": "symbol",
-            "outputs": [{"name": "", "type": "string"}],
-            "type": "function"
-        }
-    ]
-    token = web3.eth.contract(address=web3.to_checksum_address(token_address), abi=erc20_abi)
-    # single fast timestamp (not necessary here but consistent)
-    # Simulated calls (fast)
-    raw_balance = token.functions.balanceOf(ADDRESS).call()
-    decimals = token.functions.decimals().call()
-    symbol = token.functions.symbol().call()
+    token_address = _cs(token_address)
+    try:
+        # One round-trip for balanceOf + decimals + symbol
+        ret = _multicall(token_address, (_encode_balanceof(ADDRESS), _DECIMALS, _SYMBOL))
+        raw_balance, decimals, symbol = _decode_uint(ret[0]), _decode_uint(ret[1]), _decode_string(ret[2])
+    except _CALL_REVERT_ERRORS:
+        # Multicall3 not deployed / reverted / undecodable: fall back to
+        # per-contract calls. Network errors propagate instead of retrying 3x.
+        token = web3.eth.contract(address=token_address, abi=_ERC20_READ_ABI)
+        raw_balance = token.functions.balanceOf(ADDRESS).call()
+        decimals = token.functions.decimals().call()
+        symbol = token.functions.symbol().call()
     balance = raw_balance / (10 ** decimals)
     # return formatted like original
     return f"{balance:.4f} {symbol}"
 
-def swap_buy(token_address, eth_amount):
-    token_address = web3.to_checksum_address(token_address)
-    path = [web3.to_checksum_address(WETH_ADDRESS), token_address]
-    now = web3.eth.get_block("latest")["timestamp"]
-    deadline = now + 1200
+def _rpc(fn, *args):
+    """Run a blocking RPC call in a worker thread so independent calls overlap."""
+    return asyncio.to_thread(fn, *args)
+
+# Local nonce counter: seeded from the node once, then incremented per tx
+_nonce = {"v": None}
+_nonce_lock = threading.Lock()
+
+def _next_nonce(count=1):
+    """Reserve `count` consecutive nonces and return the first one."""
+    with _nonce_lock:
+        if _nonce["v"] is None:
+            _nonce["v"] = web3.eth.get_transaction_count(ADDRESS, "pending")
+        n = _nonce["v"]
+        _nonce["v"] = n + count
+        return n
+
+def _reset_nonce():
+    """Drop the local counter so the next _next_nonce() resyncs from the node.
+
+    Call this whenever a reserved nonce may not reach the node; otherwise
+    every later tx queues behind the gap.
+    """
+    with _nonce_lock:
+        _nonce["v"] = None
 
+# Latest head seen by start_head_watcher(); swaps take their deadline base from here
+_latest_block = {"timestamp": None, "number": None, "seen": 0.0}
+_HEAD_POLL_SECS = 12  # ~ one mainnet slot
+_HEAD_TTL_SECS = 60
+
+async def _poll_head():
+    block = await _rpc(web3.eth.get_block, "latest")
+    _latest_block.update(timestamp=block["timestamp"], number=block.get("number"),
+                         seen=time.monotonic())
+
+async def _head_watcher(interval):
+    failing = False
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await _poll_head()
+            failing = False
+        except Exception:
+            # Keep the last head; _swap_deadline() goes to wall clock once it
+            # is stale. Warn on the first failure of a streak, then go quiet.
+            log.log(logging.DEBUG if failing else logging.WARNING,
+                    "head poll failed", exc_info=True)
+            failing = True
+
+async def start_head_watcher(interval=_HEAD_POLL_SECS):
+    """Warm the head cache, then keep it fresh in the background.
+
+    Call once per event loop before swapping; cancel the returned task on
+    shutdown. Without it, swap deadlines are based on the wall clock.
+    """
+    try:
+        await _poll_head()
+    except Exception:
+        log.warning("initial head poll failed; using wall-clock deadlines", exc_info=True)
+    return asyncio.create_task(_head_watcher(interval))
+
+def _swap_deadline():
+    ts = _latest_block["timestamp"]
+    if ts is None or time.monotonic() - _latest_block["seen"] > _HEAD_TTL_SECS:
+        ts = int(time.time())  # watcher not running / stale: wall clock is safe here
+    return ts + _DEADLINE_SECS
+
+def _sign_buy(path, value_wei, deadline, nonce):
     tx = router.functions.swapExactETHForTokens(
         0,  # Accept any amount out
         path,
@@ -193,94 +546,144 @@ def swap_buy(token_address, eth_amount):
         deadline
     ).build_transaction({
         "from": ADDRESS,
-        "value": web3.to_wei(eth_amount, "ether"),
+        "value": value_wei,
         "gas": 250000,
-        "gasPrice": web3.to_wei("5", "gwei"),
-        "nonce": web3.eth.get_transaction_count(ADDRESS)
+        "gasPrice": _GAS_PRICE_WEI,
+        "chainId": CHAIN_ID,  # else web3 asks the node (blocking eth_chainId) per build
+        "nonce": nonce
     })
+    return account.sign_transaction(tx)
 
-    signed_tx = account.sign_transaction(tx)
-    tx_hash = web3.eth.send_raw_transaction(signed_tx.rawTransaction)
+async def swap_buy(token_address, eth_amount):
+    value = web3.to_wei(eth_amount, "ether")
+    token_address = _cs(token_address)
+    path = _buy_path(token_address)
+    deadline = _swap_deadline()
+    nonce = await _rpc(_next_nonce)
+    try:
+        signed_tx = _sign_buy(path, value, deadline, nonce)
+        tx_hash = await _rpc(web3.eth.send_raw_transaction, signed_tx.rawTransaction)
+    except BaseException:  # incl. cancellation: the nonce never reached the node
+        _reset_nonce()
+        raise
     return f"Buy Tx Sent: {web3.to_hex(tx_hash)}"
 
-def swap_sell(token_address, percentage=100):
-    token_address = web3.to_checksum_address(token_address)
-    erc20_abi = [
-        {
-            "constant": False,
-            "inputs": [
-                {"name": "spender", "type": "address"},
-                {"name": "value", "type": "uint256"}
-            ],
-            "name": "approve",
-            "outputs": [{"name": "", "type": "bool"}],
-            "type": "function"
-        },
-        {
-            "constant": True,
-            "inputs": [{"name": "owner", "type": "address"}],
-            "name": "balanceOf",
-            "outputs": [{"name": "", "type": "uint256"}],
-            "type": "function"
-        },
-        {
-            "constant": True,
-            "inputs": [],
-            "name": "decimals",
-            "outputs": [{"name": "", "type": "uint8"}],
-            "type": "function"
-        }
-    ]
-    token = web3.eth.contract(address=token_address, abi=erc20_abi)
-    # Simulated calls
-    balance = token.functions.balanceOf(ADDRESS).call()
-    decimals = token.functions.decimals().call()
-    sell_amount = int(balance * percentage / 100)
+async def batch_buy(token_address, eth_amounts):
+    """Buy `token_address` once per amount in `eth_amounts`.
 
-    # Approve (simulated)
-    approve_tx = token.functions.approve(web3.to_checksum_address(ROUTER_ADDRESS), sell_amount).build_transaction({
-        "from": ADDRESS,
-        "gas": 80000,
-        "gasPrice": web3.to_wei("5", "gwei"),
-        "nonce": web3.eth.get_transaction_count(ADDRESS)
-    })
-    signed_approve = account.sign_transaction(approve_tx)
-    web3.eth.send_raw_transaction(signed_approve.rawTransaction)
+    All wei values, the deadline and a run of nonces are prepared up front,
+    then every tx is signed before the first one is sent.
+    """
+    values = [_to_wei(a, "ether") for a in eth_amounts]
+    if not values:
+        return []
+    token_address = _cs(token_address)
+    path = _buy_path(token_address)
+    deadline = _swap_deadline()
+    nonce = await _rpc(_next_nonce, len(values))
+    results = []
+    try:
+        signed = [_sign_buy(path, v, deadline, nonce + i) for i, v in enumerate(values)]
+        for signed_tx in signed:  # nonce order
+            tx_hash = await _rpc(web3.eth.send_raw_transaction, signed_tx.rawTransaction)
+            results.append(f"Buy Tx Sent: {web3.to_hex(tx_hash)}")
+    except BaseException:
+        _reset_nonce()
+        raise
+    return results
 
-    # Sell
-    path = [token_address, web3.to_checksum_address(WETH_ADDRESS)]
-    now = web3.eth.get_block("latest")["timestamp"]
-    deadline = now + 1200
+async def swap_sell(token_address, percentage=100):
+    token_address = _cs(token_address)
+    token = web3.eth.contract(address=token_address, abi=_ERC20_WRITE_ABI)
+    # Token reads go out as one multicall
+    balance, decimals, allowance = await _rpc(
+        _read_uints, token_address,
+        (_encode_balanceof(ADDRESS), _DECIMALS, _encode_allowance(ADDRESS, ROUTER_ADDRESS)))
+    sell_amount = int(balance * percentage / 100)
+    deadline = _swap_deadline()
+    # Steady state: the router is already approved, so only the sell is sent
+    needs_approve = allowance < sell_amount
+    nonce = await _rpc(_next_nonce, 2 if needs_approve else 1)
+    try:
+        signed = []
+        if needs_approve:
+            approve_amount = _MAX_UINT256 if APPROVE_UNLIMITED else sell_amount
+            approve_tx = token.functions.approve(ROUTER_ADDRESS, approve_amount).build_transaction({
+                "from": ADDRESS,
+                "gas": 80000,
+                "gasPrice": _GAS_PRICE_WEI,
+                "chainId": CHAIN_ID,
+                "nonce": nonce
+            })
+            signed.append(account.sign_transaction(approve_tx))
+            nonce += 1
 
-    sell_tx = router.functions.swapExactTokensForETH(
-        sell_amount,
-        0,
-        path,
-        ADDRESS,
-        deadline
-    ).build_transaction({
-        "from": ADDRESS,
-        "gas": 250000,
-        "gasPrice": web3.to_wei("5", "gwei"),
-        "nonce": web3.eth.get_transaction_count(ADDRESS)
-    })
-    signed_sell = account.sign_transaction(sell_tx)
-    tx_hash = web3.eth.send_raw_transaction(signed_sell.rawTransaction)
-    return f"Sell Tx Sent: {web3.to_hex(tx_hash)}"
+        # Sell (signed alongside the approve, before anything is sent)
+        path = _sell_path(token_address)
+        sell_tx = router.functions.swapExactTokensForETH(
+            sell_amount,
+            0,
+            path,
+            ADDRESS,
+            deadline
+        ).build_transaction({
+            "from": ADDRESS,
+            "gas": 250000,
+            "gasPrice": _GAS_PRICE_WEI,
+            "chainId": CHAIN_ID,
+            "nonce": nonce
+        })
+        signed.append(account.sign_transaction(sell_tx))
+
+        # Submit together: the node holds the sell (nonce + 1) until the
+        # approve (nonce) is in, so on-chain ordering is still approve -> sell.
+        # Let both sends settle before looking at errors, so the nonce reset
+        # below never races a send that is still in flight.
+        hashes = await asyncio.gather(
+            *(_rpc(web3.eth.send_raw_transaction, tx.rawTransaction) for tx in signed),
+            return_exceptions=True)
+        failed = [h for h in hashes if isinstance(h, BaseException)]
+        if failed:
+            if len(hashes) == 2 and isinstance(hashes[0], BaseException) and not failed[1:]:
+                # Approve rejected, sell accepted: the sell sits in the node's
+                # queue behind the missing nonce. Whatever tx next fills that
+                # nonce releases it. It then executes (amountOutMin=0) if the
+                # allowance covers it by then and the deadline has not passed;
+                # otherwise it reverts and only costs gas.
+                log.error("approve (nonce %d) rejected but sell (nonce %d) was accepted "
+                          "and is queued until nonce %d is used", nonce - 1, nonce, nonce - 1)
+            raise failed[0]
+    except BaseException:
+        _reset_nonce()
+        raise
+    return f"Sell Tx Sent: {web3.to_hex(hashes[-1])}"
 
 # ---------- Demo block so running the script shows output immediately ----------
+async def _demo(sample_token):
+    watcher = await start_head_watcher()
+    try:
+        print("Head cache: block timestamp", _latest_block["timestamp"],
+              "-> swap deadline", _swap_deadline())
+
+        print("\nSimulating buy...")
+        print(await swap_buy(sample_token, 0.01))
+
+        print("\nSimulating batch buy...")
+        for line in await batch_buy(sample_token, [0.01, 0.02, 0.05]):
+            print(line)
+
+        print("\nSimulating sell...")
+        print(await swap_sell(sample_token, 50))
+    finally:
+        watcher.cancel()
+
 if __name__ == "__main__":
     sample_token = "0x000000000000000000000000000000000000dead"
     print("Checking token balance...")
     balance = check_token_balance(sample_token)
     print("Balance:", balance)
 
-    print("\nSimulating buy...")
-    buy_tx = swap_buy(sample_token, 0.01)
-    print(buy_tx)
-
-    print("\nSimulating sell...")
-    sell_tx = swap_sell(sample_token, 50)
-    print(sell_tx)
+    print("\nStarting head watcher...")
+    asyncio.run(_demo(sample_token))
 
     print("\nDemo run complete!")